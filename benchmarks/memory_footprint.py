@@ -0,0 +1,152 @@
+"""
+Memory footprint: dict-per-chunk (legacy) vs compact records.
+
+Legacy  = chunk dict + embedding dict holding a list of Python floats
+Compact = slotted ChunkRecord + one shared float32 VectorBuffer
+          (--sparse: SparseVectorBuffer, cost follows non-zeros, not dim;
+          legacy is then measured at its real dim, 256)
+
+Usage:
+    python -m benchmarks.memory_footprint [--sizes 100000,1000000] [--dim 256] [--sparse]
+
+The legacy layout is measured on a --sample of chunks and scaled
+linearly (1M legacy chunks at dim 256 needs several GB). The compact
+layout is measured at full size unless --sample-compact is given.
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from embeddings.sparse_buffer import buffer_for
+from memory.records import ChunkRecord
+
+
+LEGACY_DIM = 256
+SOURCES = [f"/docs/file_{i}.pdf" for i in range(50)]
+
+
+def _sparse_vector(dim: int, nnz: int = 24):
+    counts = {}
+    for _ in range(nnz):
+        index = random.randrange(dim)
+        counts[index] = counts.get(index, 0.0) + 1.0
+
+    indices = sorted(counts)
+    norm = sum(x * x for x in counts.values()) ** 0.5
+    return indices, [counts[i] / norm for i in indices]
+
+
+def _vector(dim: int, nnz: int = 24):
+    vector = [0.0] * dim
+    for _ in range(nnz):
+        vector[random.randrange(dim)] += 1.0
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector]
+
+
+def _chunk(i: int, memory_id: str, created_at: str) -> dict:
+    return {
+        "chunk_id": str(uuid.uuid4()),
+        "memory_id": memory_id,
+        "chunk_index": i % 40,
+        "offset": i * 700,
+        "length": 700,
+        # json.load() gives every record its own string objects
+        "source": "".join(SOURCES[i % len(SOURCES)]),
+        "created_at": "".join(created_at),
+    }
+
+
+def _build_legacy(n: int, dim: int):
+    chunks, embeddings = {}, {}
+    created_at = datetime.utcnow().isoformat()
+
+    for i in range(n):
+        if i % 40 == 0:
+            memory_id = str(uuid.uuid4())
+
+        chunk = _chunk(i, memory_id, created_at)
+        chunks[chunk["chunk_id"]] = chunk
+        embeddings[chunk["chunk_id"]] = {
+            "chunk_id": chunk["chunk_id"],
+            "embedding": _vector(dim),
+            "embedding_model": "".join(f"hash-bow-{dim}"),
+            "normalized": True,
+            "created_at": "".join(created_at),
+        }
+
+    return chunks, embeddings
+
+
+def _build_compact(n: int, dim: int, sparse: bool = False):
+    chunks, buffer = {}, buffer_for(sparse=sparse, dim=dim)
+    created_at = datetime.utcnow().isoformat()
+
+    for i in range(n):
+        if i % 40 == 0:
+            memory_id = str(uuid.uuid4())
+
+        chunk = _chunk(i, memory_id, created_at)
+        chunks[chunk["chunk_id"]] = ChunkRecord.from_dict(chunk)
+        vector = _sparse_vector(dim) if sparse else _vector(dim)
+        buffer.add(chunk["chunk_id"], vector, f"hash-bow-{dim}", created_at=chunk["created_at"])
+
+    return chunks, buffer
+
+
+def measure(build, n: int, dim: int, **kwargs) -> int:
+    gc.collect()
+    tracemalloc.start()
+    data = build(n, dim, **kwargs)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def _fmt(num_bytes: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:8.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:8.1f} TB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--sample", type=int, default=10000)
+    parser.add_argument("--sample-compact", action="store_true")
+    parser.add_argument("--sparse", action="store_true")
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    sample = args.sample
+    legacy_dim = LEGACY_DIM if args.sparse else args.dim
+    legacy_per_chunk = measure(_build_legacy, sample, legacy_dim) / sample
+
+    layout = "sparse" if args.sparse else "dense"
+    print(
+        f"dim={args.dim} ({layout})  legacy dim={legacy_dim}, "
+        f"measured on {sample} chunks, scaled"
+    )
+    print(f"{'chunks':>10} {'legacy':>12} {'compact':>12} {'ratio':>7}")
+
+    for n in (int(s) for s in args.sizes.split(",")):
+        if args.sample_compact:
+            compact = measure(_build_compact, sample, args.dim, sparse=args.sparse) / sample * n
+        else:
+            compact = measure(_build_compact, n, args.dim, sparse=args.sparse)
+
+        legacy = legacy_per_chunk * n
+        print(f"{n:>10} {_fmt(legacy):>12} {_fmt(compact):>12} {legacy / compact:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
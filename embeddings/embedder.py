@@ -1,6 +1,6 @@
 import math
 import re
-from typing import List
+from typing import Dict, List, Tuple
 import hashlib
 
 
@@ -8,27 +8,46 @@ class SimpleEmbedder:
     """
     Deterministic, local text embedder.
     Converts text into a fixed-size normalized vector.
+
+    embed_sparse() gives the same vector as (indices, values):
+    only the buckets a text actually hits, so dim can be large.
     """
 
     def __init__(self, dim: int = 256):
         self.dim = dim
         self.model_name = f"hash-bow-{dim}"
 
+    @classmethod
+    def from_model_name(cls, model_name: str) -> "SimpleEmbedder":
+        """
+        Rebuild the embedder that produced a stored generation.
+        """
+        match = re.fullmatch(r"hash-bow-(\d+)", model_name)
+        if not match:
+            raise ValueError(f"Unknown embedding model: {model_name}")
+        return cls(dim=int(match.group(1)))
+
     def _tokenize(self, text: str) -> List[str]:
         # lowercase + simple word split
         return re.findall(r"\b\w+\b", text.lower())
 
     def embed(self, text: str) -> List[float]:
         vector = [0.0] * self.dim
-        tokens = self._tokenize(text)
+        for idx, value in zip(*self.embed_sparse(text)):
+            vector[idx] = value
+        return vector
+
+    def embed_sparse(self, text: str) -> Tuple[List[int], List[float]]:
+        counts: Dict[int, float] = {}
 
-        for token in tokens:
+        for token in self._tokenize(text):
             # stable hash → index
             h = int(hashlib.sha256(token.encode()).hexdigest(), 16)
             idx = h % self.dim
-            vector[idx] += 1.0
+            counts[idx] = counts.get(idx, 0.0) + 1.0
 
-        return self._normalize(vector)
+        indices = sorted(counts)
+        return indices, self._normalize([counts[i] for i in indices])
 
     def _normalize(self, vector: List[float]) -> List[float]:
         norm = math.sqrt(sum(x * x for x in vector))
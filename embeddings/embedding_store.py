@@ -1,48 +1,98 @@
 import json
 import os
-from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from embeddings.sparse_buffer import buffer_for
+from embeddings.vector_buffer import Vector
 
 
 class EmbeddingStore:
     """
     Disk-backed store for embeddings.
     Safe to delete and rebuild.
+
+    In memory, vectors live in a shared columnar VectorBuffer
+    (float32); the JSON file format is unchanged.
+
+    sparse=True stores (indices, values) records instead of dense
+    embeddings. An existing file keeps whatever layout it was written in.
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, sparse: bool = False, dim: Optional[int] = None):
         self.path = path
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        self.embeddings: Dict[str, Dict] = {}
+        self.buffer = buffer_for(sparse=sparse, dim=dim)
         self._load()
 
+    @property
+    def sparse(self) -> bool:
+        return self.buffer.sparse
+
     def _load(self):
         if os.path.exists(self.path):
             with open(self.path, "r") as f:
-                self.embeddings = json.load(f)
+                records = json.load(f)
+
+            if records:
+                self.buffer = buffer_for(next(iter(records.values())))
+            for record in records.values():
+                self.buffer.add_record(record)
         else:
             self._persist()
 
+    def reload(self):
+        """
+        Re-read state written by another process.
+        """
+        self.buffer = buffer_for(sparse=self.buffer.sparse, dim=self.buffer.dim)
+        self._load()
+
     def _persist(self):
-        with open(self.path, "w") as f:
-            json.dump(self.embeddings, f, indent=2)
+        # Atomic: readers never see a half-written generation
+        temp_path = self.path + ".tmp"
+
+        with open(temp_path, "w") as f:
+            json.dump(self.buffer.records(), f, indent=2)
+
+        os.replace(temp_path, self.path)
 
     def add(
         self,
         chunk_id: str,
-        vector: List[float],
+        vector: Vector,
         model_name: str,
         normalized: bool = True
     ):
-        self.embeddings[chunk_id] = {
-            "chunk_id": chunk_id,
-            "embedding": vector,
-            "embedding_model": model_name,
-            "normalized": normalized,
-            "created_at": datetime.utcnow().isoformat()
-        }
+        self.buffer.add(chunk_id, vector, model_name, normalized)
         self._persist()
 
+    def add_many(
+        self,
+        items: Iterable[Tuple[str, Vector]],
+        model_name: str,
+        normalized: bool = True
+    ):
+        """
+        Add a batch of (chunk_id, vector) pairs with a single write.
+        """
+        for chunk_id, vector in items:
+            self.buffer.add(chunk_id, vector, model_name, normalized)
+        self._persist()
+
+    def record(self, chunk_id: str) -> Dict:
+        return self.buffer.record(chunk_id)
+
     def all(self) -> Dict[str, Dict]:
-        return self.embeddings
-    
+        """
+        Materialized {chunk_id: record} view (for export only).
+        """
+        return self.buffer.records()
+
+    def chunk_ids(self) -> List[str]:
+        return self.buffer.chunk_ids
+
+    def models(self) -> Set[str]:
+        """
+        Embedding models present in this generation.
+        """
+        return self.buffer.models()
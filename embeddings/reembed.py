@@ -0,0 +1,164 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+from embeddings.embedder import SimpleEmbedder
+from embeddings.embedding_store import EmbeddingStore
+from memory.metadata_store import MetadataStore
+
+
+class ReembedJob:
+    """
+    Background migration to a new embedding generation.
+
+    - Re-embeds chunks into a staging store next to the active one
+      (<store>.<model>[.sparse].staging.json), one checkpointed batch
+      at a time
+    - Resumable: chunks already in the staging store are skipped
+    - Queries keep using the active store until switch_over(),
+      which atomically replaces it with the finished generation
+    - sparse=True writes the new generation as (indices, values)
+    """
+
+    def __init__(
+        self,
+        embedding_store_path: str,
+        metadata_store_path: str,
+        embedder: SimpleEmbedder,
+        batch_size: int = 64,
+        sparse: bool = False,
+    ):
+        self.embedding_store_path = embedding_store_path
+        self.metadata_store_path = metadata_store_path
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.sparse = sparse
+
+        # Layout is part of the name: a dense run never resumes as sparse
+        base, ext = os.path.splitext(embedding_store_path)
+        layout = ".sparse" if sparse else ""
+        self.staging_path = f"{base}.{embedder.model_name}{layout}.staging{ext}"
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def run(self, switch: bool = True) -> Dict:
+        """
+        Re-embed every pending chunk, then (optionally) switch over.
+        """
+        staging = self._staging()
+        metadata = MetadataStore(self.metadata_store_path)
+
+        pending = self._pending(staging)
+
+        for i in range(0, len(pending), self.batch_size):
+            if self._stop.is_set():
+                return self.status()
+
+            batch = []
+            for chunk_id in pending[i:i + self.batch_size]:
+                chunk = metadata.get_chunk(chunk_id)
+                if chunk is None:
+                    continue  # orphan embedding: not carried over
+                batch.append((chunk_id, self._embed(staging, chunk["chunk_text"])))
+
+            # Checkpoint: one atomic write per batch
+            staging.add_many(batch, model_name=self.embedder.model_name)
+
+        if switch:
+            self.switch_over()
+
+        return self.status()
+
+    def start(self, switch: bool = True) -> threading.Thread:
+        """
+        Run in a daemon thread; queries are not blocked meanwhile.
+        """
+        def target():
+            try:
+                self.run(switch=switch)
+            except BaseException as e:
+                self.error = e
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=target, name="reembed", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """
+        Pause after the current batch (progress is kept on disk).
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def status(self) -> Dict:
+        active = EmbeddingStore(self.embedding_store_path).buffer
+        model = self.embedder.model_name
+
+        if os.path.exists(self.staging_path):
+            staging = EmbeddingStore(self.staging_path).buffer
+            done = sum(1 for cid in active.chunk_ids if cid in staging)
+        else:
+            done = sum(1 for cid in active.chunk_ids if active.model(cid) == model)
+
+        return {
+            "model": model,
+            "active_models": sorted(active.models()),
+            "done": done,
+            "total": len(active),
+        }
+
+    def switch_over(self):
+        """
+        Catch up on chunks ingested meanwhile, then atomically
+        replace the active generation with the staging one.
+        """
+        staging = self._staging()
+        metadata = MetadataStore(self.metadata_store_path)
+
+        late = [
+            (chunk_id, self._embed(staging, chunk["chunk_text"]))
+            for chunk_id, chunk in (
+                (cid, metadata.get_chunk(cid)) for cid in self._pending(staging)
+            )
+            if chunk is not None
+        ]
+        if late:
+            staging.add_many(late, model_name=self.embedder.model_name)
+
+        os.replace(self.staging_path, self.embedding_store_path)
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+
+    def _staging(self) -> EmbeddingStore:
+        return EmbeddingStore(
+            self.staging_path, sparse=self.sparse, dim=self.embedder.dim
+        )
+
+    def _embed(self, staging: EmbeddingStore, text: str):
+        if staging.sparse:
+            return self.embedder.embed_sparse(text)
+        return self.embedder.embed(text)
+
+    def _pending(self, staging: EmbeddingStore) -> List[str]:
+        """
+        Active chunk ids not yet present in the new generation.
+        """
+        model = self.embedder.model_name
+
+        return [
+            chunk_id
+            for chunk_id in EmbeddingStore(self.embedding_store_path).chunk_ids()
+            if staging.buffer.model(chunk_id) != model
+        ]
@@ -0,0 +1,214 @@
+import heapq
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from embeddings.vector_buffer import RowBuffer, Vector, VectorBuffer
+
+
+class SparseVectorBuffer(RowBuffer):
+    """
+    Sparse embedding storage for hashed bag-of-words vectors.
+
+    - Row-major: starts / lengths into flat indices / values, used to
+      read one row back and to score a pre-filtered set of rows
+    - Bucket-major postings: bucket → (rows, values), so a query only
+      touches the buckets it contains
+
+    Memory and scoring scale with non-zeros, not dim, so a large dim
+    (fewer hash collisions) costs nothing extra.
+
+    Appends update both layouts incrementally. An overwrite appends the
+    new row data and repoints the row; postings are then rebuilt once,
+    on the next unfiltered query, however many rows were overwritten.
+    """
+
+    sparse = True
+
+    def __init__(self, dim: Optional[int] = None):
+        super().__init__(dim)
+
+        self.starts = array("L")
+        self.lengths = array("I")
+        self.indices = array("I")
+        self.values = array("f")
+
+        self.postings: Dict[int, Tuple[array, array]] = {}
+
+        self._garbage = 0  # non-zeros left behind by overwrites
+        self._postings_stale = False
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    def add(
+        self,
+        chunk_id: str,
+        vector: Vector,
+        model_name: str,
+        normalized: bool = True,
+        created_at: Optional[str] = None,
+    ) -> int:
+        """
+        Insert or overwrite a row. Returns the row number.
+        """
+        if isinstance(vector, tuple):
+            indices, values = vector
+        else:
+            if self.dim is None:
+                self.dim = len(vector)
+            indices, values = sparsify(vector)
+
+        if self.dim is not None and indices and max(indices) >= self.dim:
+            raise ValueError(
+                f"Embedding {chunk_id} has bucket {max(indices)}, dim is {self.dim}"
+            )
+
+        exists = chunk_id in self.rows
+        row = self._write_meta(chunk_id, model_name, normalized, created_at)
+        start = len(self.indices)
+
+        self.indices.extend(indices)
+        self.values.extend(values)
+
+        if exists:
+            self._garbage += self.lengths[row]
+            self.starts[row] = start
+            self.lengths[row] = len(indices)
+            self._postings_stale = True
+
+            # Amortized: compact once garbage outweighs live data
+            if self._garbage > len(self.indices) // 2:
+                self._compact()
+            return row
+
+        self.starts.append(start)
+        self.lengths.append(len(indices))
+
+        if not self._postings_stale:
+            self._post(row, indices, values)
+        return row
+
+    def _post(self, row: int, indices: Iterable[int], values: Iterable[float]):
+        for index, value in zip(indices, values):
+            posting = self.postings.get(index)
+            if posting is None:
+                posting = self.postings[index] = (array("I"), array("f"))
+            posting[0].append(row)
+            posting[1].append(value)
+
+    def _compact(self):
+        """
+        Drop overwritten row data from the row-major arrays.
+        """
+        indices, values = array("I"), array("f")
+
+        for row in range(len(self.chunk_ids)):
+            row_indices, row_values = self._row(row)
+            self.starts[row] = len(indices)
+            indices.extend(row_indices)
+            values.extend(row_values)
+
+        self.indices, self.values = indices, values
+        self._garbage = 0
+
+    def _fresh_postings(self) -> Dict[int, Tuple[array, array]]:
+        if self._postings_stale:
+            self.postings = {}
+            for row in range(len(self.chunk_ids)):
+                self._post(row, *self._row(row))
+            self._postings_stale = False
+        return self.postings
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+
+    def get(self, chunk_id: str) -> Optional[Dict[int, float]]:
+        row = self.rows.get(chunk_id)
+        if row is None:
+            return None
+        return dict(zip(*self._row(row)))
+
+    def _row(self, row: int) -> Tuple[array, array]:
+        start = self.starts[row]
+        end = start + self.lengths[row]
+        return self.indices[start:end], self.values[start:end]
+
+    def _vector_fields(self, row: int) -> Dict:
+        indices, values = self._row(row)
+        return {
+            "dim": self.dim,
+            "indices": indices.tolist(),
+            "values": values.tolist(),
+        }
+
+    # -------------------------------------------------
+    # Scoring
+    # -------------------------------------------------
+
+    def top_k(
+        self,
+        query: Vector,
+        k: int,
+        rows: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Highest dot products as (row, score), best first.
+
+        Unfiltered: accumulate over the query's posting lists.
+        Filtered: score only the selected rows (row-major).
+        Rows sharing no bucket with the query are not returned.
+        """
+        if not isinstance(query, tuple):
+            if self.dim is not None and len(query) != self.dim:
+                raise ValueError(f"Query dim {len(query)} != index dim {self.dim}")
+            query = sparsify(query)
+
+        q_indices, q_values = query
+        if self.dim is not None and q_indices and max(q_indices) >= self.dim:
+            raise ValueError(f"Query bucket {max(q_indices)} >= index dim {self.dim}")
+
+        if rows is not None:
+            weights = dict(zip(q_indices, q_values))
+            scored = (
+                (row, sum(weights.get(i, 0.0) * v for i, v in zip(*self._row(row))))
+                for row in rows
+            )
+            return heapq.nlargest(k, scored, key=lambda item: item[1])
+
+        postings = self._fresh_postings()
+
+        scores: Dict[int, float] = {}
+        for index, weight in zip(q_indices, q_values):
+            posting = postings.get(index)
+            if posting is None:
+                continue
+            for row, value in zip(*posting):
+                scores[row] = scores.get(row, 0.0) + weight * value
+
+        # Ties break by row, like the dense scan
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def sparsify(vector: Iterable[float]) -> Tuple[List[int], List[float]]:
+    indices, values = [], []
+    for index, value in enumerate(vector):
+        if value:
+            indices.append(index)
+            values.append(value)
+    return indices, values
+
+
+def buffer_for(
+    record: Optional[Dict] = None,
+    sparse: bool = False,
+    dim: Optional[int] = None,
+) -> RowBuffer:
+    """
+    Empty buffer matching a stored record's layout (or the requested one).
+    """
+    if record is not None:
+        sparse = "indices" in record
+        dim = record.get("dim", dim)
+    return SparseVectorBuffer(dim) if sparse else VectorBuffer(dim)
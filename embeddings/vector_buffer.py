@@ -0,0 +1,275 @@
+import heapq
+from abc import ABC, abstractmethod
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from memory.records import intern
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Dense list of floats, or sparse (indices, values)
+Vector = Union[List[float], Tuple[List[int], List[float]]]
+
+
+class RowBuffer(ABC):
+    """
+    Row-addressed embedding storage: shared per-row columns.
+
+    Subclasses decide how vectors are laid out (dense / sparse).
+    Model names are interned and stored as small ids.
+    """
+
+    sparse = False
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+
+        self.chunk_ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+        self.model_names: List[str] = []
+        self.model_ids = array("H")
+        self.normalized = array("b")
+        self.created_at: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.rows
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    @abstractmethod
+    def add(
+        self,
+        chunk_id: str,
+        vector: Vector,
+        model_name: str,
+        normalized: bool = True,
+        created_at: Optional[str] = None,
+    ) -> int:
+        """
+        Insert or overwrite a row. Returns the row number.
+        """
+
+    def add_record(self, record: Dict) -> int:
+        if self.dim is None:
+            self.dim = record.get("dim")
+
+        if "indices" in record:
+            vector = (record["indices"], record["values"])
+        else:
+            vector = record["embedding"]
+
+        return self.add(
+            chunk_id=record["chunk_id"],
+            vector=vector,
+            model_name=record["embedding_model"],
+            normalized=record.get("normalized", True),
+            created_at=record.get("created_at"),
+        )
+
+    def _write_meta(
+        self,
+        chunk_id: str,
+        model_name: str,
+        normalized: bool,
+        created_at: Optional[str],
+    ) -> int:
+        """
+        Insert or overwrite the per-row columns. Returns the row number.
+        """
+        model_id = self._model_id(model_name)
+        created_at = intern(created_at or datetime.utcnow().isoformat())
+
+        row = self.rows.get(chunk_id)
+        if row is not None:
+            self.model_ids[row] = model_id
+            self.normalized[row] = normalized
+            self.created_at[row] = created_at
+            return row
+
+        row = len(self.chunk_ids)
+        self.rows[chunk_id] = row
+        self.chunk_ids.append(chunk_id)
+        self.model_ids.append(model_id)
+        self.normalized.append(normalized)
+        self.created_at.append(created_at)
+        return row
+
+    def _model_id(self, model_name: str) -> int:
+        try:
+            return self.model_names.index(model_name)
+        except ValueError:
+            self.model_names.append(intern(model_name))
+            return len(self.model_names) - 1
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+
+    def model(self, chunk_id: str) -> Optional[str]:
+        row = self.rows.get(chunk_id)
+        if row is None:
+            return None
+        return self.model_names[self.model_ids[row]]
+
+    def models(self) -> Set[str]:
+        return {self.model_names[i] for i in set(self.model_ids)}
+
+    def record(self, chunk_id: str) -> Dict:
+        """
+        Persisted (JSON) form of one row.
+        """
+        row = self.rows[chunk_id]
+        return {
+            "chunk_id": chunk_id,
+            **self._vector_fields(row),
+            "embedding_model": self.model_names[self.model_ids[row]],
+            "normalized": bool(self.normalized[row]),
+            "created_at": self.created_at[row],
+        }
+
+    def records(self) -> Dict[str, Dict]:
+        return {cid: self.record(cid) for cid in self.chunk_ids}
+
+    @abstractmethod
+    def _vector_fields(self, row: int) -> Dict:
+        """
+        Persisted vector fields of one row.
+        """
+
+
+class VectorBuffer(RowBuffer):
+    """
+    Dense, columnar embedding storage.
+
+    - All vectors live in ONE flat array('f') (float32, row-major)
+    - EmbeddingStore, VectorIndex and SnapshotReader share the
+      same buffer instead of each keeping a copy
+
+    Scoring uses NumPy (zero-copy view) when installed,
+    pure Python over a memoryview otherwise.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        super().__init__(dim)
+        self.data = array("f")
+
+    def add(
+        self,
+        chunk_id: str,
+        vector: Vector,
+        model_name: str,
+        normalized: bool = True,
+        created_at: Optional[str] = None,
+    ) -> int:
+        """
+        Insert or overwrite a row. Returns the row number.
+        """
+        if isinstance(vector, tuple):
+            vector = densify(vector, self.dim)
+
+        values = array("f", vector)
+
+        if self.dim is None:
+            self.dim = len(values)
+        elif len(values) != self.dim:
+            raise ValueError(
+                f"Embedding {chunk_id} has dim {len(values)}, expected {self.dim}"
+            )
+
+        exists = chunk_id in self.rows
+        row = self._write_meta(chunk_id, model_name, normalized, created_at)
+
+        if exists:
+            self.data[row * self.dim:(row + 1) * self.dim] = values
+        else:
+            self.data.extend(values)
+        return row
+
+    def get(self, chunk_id: str) -> Optional[array]:
+        row = self.rows.get(chunk_id)
+        if row is None:
+            return None
+        return self.data[row * self.dim:(row + 1) * self.dim]
+
+    def _vector_fields(self, row: int) -> Dict:
+        return {
+            "embedding": self.data[row * self.dim:(row + 1) * self.dim].tolist()
+        }
+
+    # -------------------------------------------------
+    # Scoring
+    # -------------------------------------------------
+
+    def top_k(
+        self,
+        query: List[float],
+        k: int,
+        rows: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Highest dot products as (row, score), best first.
+        """
+        if isinstance(query, tuple):
+            query = densify(query, self.dim)
+
+        if self.dim is not None and len(query) != self.dim:
+            raise ValueError(f"Query dim {len(query)} != index dim {self.dim}")
+
+        if not self.chunk_ids:
+            return []
+
+        if np is not None:
+            return self._top_k_numpy(query, k, rows)
+
+        dim = self.dim
+        if rows is None:
+            rows = range(len(self.chunk_ids))
+
+        with memoryview(self.data) as view:
+            scored = (
+                (row, sum(q * x for q, x in zip(query, view[row * dim:(row + 1) * dim])))
+                for row in rows
+            )
+            return heapq.nlargest(k, scored, key=lambda item: item[1])
+
+    def _top_k_numpy(self, query, k, rows) -> List[Tuple[int, float]]:
+        matrix = np.frombuffer(self.data, dtype=np.float32).reshape(-1, self.dim)
+        q = np.asarray(query, dtype=np.float32)
+
+        if rows is None:
+            row_ids = np.arange(len(self.chunk_ids))
+            scores = matrix @ q
+        else:
+            row_ids = np.fromiter(rows, dtype=np.int64)
+            scores = matrix[row_ids] @ q
+
+        if len(scores) > k:
+            best = np.argpartition(-scores, k)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        result = [(int(row_ids[i]), float(scores[i])) for i in best]
+        del matrix  # release the buffer export so the array can grow again
+        return result
+
+
+def densify(vector: Tuple[List[int], List[float]], dim: Optional[int]) -> List[float]:
+    if dim is None:
+        raise ValueError("Cannot densify a sparse vector without a dimension")
+
+    dense = [0.0] * dim
+    for index, value in zip(*vector):
+        dense[index] = value
+    return dense
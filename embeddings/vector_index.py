@@ -1,31 +1,54 @@
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from embeddings.vector_buffer import RowBuffer, Vector
 
 
 class VectorIndex:
     """
     Simple in-memory cosine similarity index.
+
+    A view over a shared buffer (no copy): rows are what
+    attribute filters select before scoring. All vectors share
+    one dimension. Works over dense (VectorBuffer) and sparse
+    (SparseVectorBuffer) layouts alike.
     """
 
-    def __init__(self, embeddings: Dict[str, Dict]):
-        self.vectors = {
-            cid: data["embedding"]
-            for cid, data in embeddings.items()
-        }
+    def __init__(self, buffer: RowBuffer):
+        self.buffer = buffer
 
-    def _dot(self, a: List[float], b: List[float]) -> float:
-        return sum(x * y for x, y in zip(a, b))
+    @property
+    def chunk_ids(self) -> List[str]:
+        return self.buffer.chunk_ids
 
-    def search(
-        self,
-        query_vector: List[float],
-        top_k: int = 5
-    ) -> List[Tuple[str, float]]:
+    @property
+    def rows(self) -> Dict[str, int]:
+        return self.buffer.rows
 
-        scores = []
+    @property
+    def sparse(self) -> bool:
+        return self.buffer.sparse
 
-        for chunk_id, vector in self.vectors.items():
-            score = self._dot(query_vector, vector)
-            scores.append((chunk_id, score))
+    @property
+    def dim(self) -> Optional[int]:
+        return self.buffer.dim
 
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:top_k]
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def get(self, chunk_id: str) -> Optional[List[float]]:
+        return self.buffer.get(chunk_id)
+
+    def search(
+        self,
+        query_vector: Vector,
+        top_k: int = 5,
+        rows: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Score all rows, or only the given (pre-filtered) rows.
+        (Query dimension is checked by the buffer.)
+        """
+        return [
+            (self.chunk_ids[row], score)
+            for row, score in self.buffer.top_k(query_vector, top_k, rows)
+        ]
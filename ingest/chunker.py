@@ -1,71 +1,202 @@
 import json
 import os
+import re
 import uuid
 from datetime import datetime
-from typing import List, Dict
+from collections import deque
+from typing import List, Dict, Iterator, Tuple
+
+from memory.metadata_store import MetadataStore
+
+
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[^\S\n]*\n\s*")
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)")
+_TOKEN_RE = re.compile(r"\w+")
 
 
 class Chunker:
     """
     Deterministic chunking engine.
     Transforms memory text into semantically coherent chunks.
+
+    Chunk size is bounded in tokens (words):
+    - paragraphs smaller than min_tokens are merged
+    - no chunk exceeds max_tokens (sentence / token-window fallback)
+    - consecutive chunks may share overlap_tokens words
     """
 
-    def __init__(self, memory_path: str, chunk_path: str):
+    def __init__(
+        self,
+        memory_path: str,
+        chunk_path: str,
+        min_tokens: int = 40,
+        max_tokens: int = 256,
+        overlap_tokens: int = 0,
+    ):
+        if not 0 < min_tokens <= max_tokens:
+            raise ValueError("Require 0 < min_tokens <= max_tokens")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("Require 0 <= overlap_tokens < max_tokens")
+
         self.memory_path = memory_path
         self.chunk_path = chunk_path
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
 
         # Ensure output directory exists
         os.makedirs(os.path.dirname(self.chunk_path), exist_ok=True)
 
     def load_memories(self) -> List[Dict]:
         """
-        Load source-of-truth memories ONLY.
+        Load source-of-truth memories ONLY (with their raw text).
         """
-        with open(self.memory_path, "r") as f:
-            data = json.load(f)
+        store = MetadataStore(self.memory_path)
+
+        return [
+            dict(memory, text=store.get_memory_text(memory["memory_id"]) or "")
+            for memory in store.all_memories()
+        ]
 
-        # 🔒 CRITICAL FIX: metadata.json is a dict, not a list
-        if isinstance(data, dict):
-            return data.get("memories", [])
+    def load_chunks(self) -> List[Dict]:
+        if not os.path.exists(self.chunk_path):
+            return []
 
-        return data  # fallback (older formats)
+        with open(self.chunk_path, "r") as f:
+            return json.load(f)
 
     def save_chunks(self, chunks: List[Dict]):
         """
         Persist derived chunks (disposable).
+        Text is not copied when chunks point into their memory; legacy
+        chunks without an offset keep theirs (it is all they have).
         """
         with open(self.chunk_path, "w") as f:
-            json.dump(chunks, f, indent=2)
+            json.dump(
+                [
+                    {
+                        k: v for k, v in chunk.items()
+                        if k != "chunk_text" or chunk.get("offset") is None
+                    }
+                    for chunk in chunks
+                ],
+                f,
+                indent=2,
+            )
 
-    def chunk_text(self, text: str) -> List[str]:
+    def chunk_spans(self, text: str) -> List[Tuple[int, int]]:
         """
         Chunk text based on paragraph boundaries first.
         Paragraphs are semantic hints, not hard rules.
+
+        Single pass over the text; returns (start, end) character
+        offsets so chunks can reference the source without copying it.
         """
-        raw_paragraphs = [
-            p.strip() for p in text.split("\n\n") if p.strip()
-        ]
+        spans = []
+        parts: List[Tuple[int, int, int]] = []  # (start, end, tokens)
+        tokens = 0
+        seeded = False  # parts[0] is overlap carried from previous chunk
 
-        chunks = []
-        buffer = ""
+        for start, end, unit_tokens, opens_paragraph in self._units(text):
+            too_big = tokens + unit_tokens > self.max_tokens
+            new_topic = (
+                opens_paragraph
+                and unit_tokens >= self.min_tokens
+                and tokens >= self.min_tokens
+            )
+
+            if parts and (too_big or new_topic):
+                if seeded and len(parts) == 1:
+                    # Only overlap so far: never let it force an oversized chunk
+                    if too_big:
+                        parts, tokens, seeded = [], 0, False
+                else:
+                    spans.append((parts[0][0], parts[-1][1]))
+                    parts = self._overlap(text, parts[0][0], parts[-1][1])
+                    tokens = sum(p[2] for p in parts)
+                    seeded = bool(parts)
+
+                    if tokens + unit_tokens > self.max_tokens:
+                        parts, tokens, seeded = [], 0, False
+
+            parts.append((start, end, unit_tokens))
+            tokens += unit_tokens
 
-        for paragraph in raw_paragraphs:
-            if not buffer:
-                buffer = paragraph
+        if parts and not (seeded and len(parts) == 1):
+            spans.append((parts[0][0], parts[-1][1]))
+
+        return spans
+
+    def _units(self, text: str) -> Iterator[Tuple[int, int, int, bool]]:
+        """
+        Yield (start, end, tokens, opens_paragraph) scan units:
+        paragraphs, or sentences / token windows of oversized ones.
+        """
+        for start, end in _paragraphs(text):
+            tokens = _count_tokens(text, start, end)
+
+            if tokens == 0:
                 continue
 
-            # Merge small dependent paragraphs
-            if len(paragraph.split()) < 40:
-                buffer += " " + paragraph
-            else:
-                chunks.append(buffer)
-                buffer = paragraph
+            if tokens <= self.max_tokens:
+                yield start, end, tokens, True
+                continue
 
-        if buffer:
-            chunks.append(buffer)
+            opens = True
+            for s_start, s_end in _sentences(text, start, end):
+                s_tokens = _count_tokens(text, s_start, s_end)
 
-        return chunks
+                if s_tokens <= self.max_tokens:
+                    yield s_start, s_end, s_tokens, opens
+                else:
+                    for w_start, w_end, w_tokens in self._windows(text, s_start, s_end):
+                        yield w_start, w_end, w_tokens, opens
+                        opens = False
+
+                opens = False
+
+    def _windows(
+        self, text: str, start: int, end: int
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Hard split of a single oversized sentence into windows.
+
+        Windows leave room for the overlap seed, so each chunk is
+        seed + window <= max_tokens and consecutive windows share
+        overlap_tokens words.
+        """
+        size = self.max_tokens - self.overlap_tokens
+        window: List[re.Match] = []
+
+        for match in _TOKEN_RE.finditer(text, start, end):
+            window.append(match)
+            if len(window) == size:
+                yield window[0].start(), window[-1].end(), len(window)
+                window = []
+
+        if window:
+            yield window[0].start(), window[-1].end(), len(window)
+
+    def _overlap(
+        self, text: str, start: int, end: int
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Seed part covering the last overlap_tokens words of a chunk.
+        """
+        if self.overlap_tokens == 0:
+            return []
+
+        tail = deque(
+            (m.start() for m in _TOKEN_RE.finditer(text, start, end)),
+            maxlen=self.overlap_tokens,
+        )
+        if not tail:
+            return []
+
+        return [(tail[0], end, len(tail))]
+
+    def chunk_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.chunk_spans(text)]
 
     def build_chunks(self) -> List[Dict]:
         """
@@ -76,24 +207,36 @@ class Chunker:
         all_chunks = []
 
         for memory in memories:
-            memory_id = memory["memory_id"]
-            source = memory["source"]
-            created_at = datetime.utcnow().isoformat()
+            all_chunks.extend(self.chunk_memory(memory))
 
-            text_chunks = self.chunk_text(memory["text"])
+        return all_chunks
+
+    def chunk_memory(self, memory: Dict) -> List[Dict]:
+        """
+        Memory (with text) -> its chunks.
+        """
+        memory_id = memory["memory_id"]
+        source = memory["source"]
+        created_at = datetime.utcnow().isoformat()
 
-            for idx, chunk_text in enumerate(text_chunks):
-                chunk = {
+        text = memory["text"]
+        chunks = []
+
+        for idx, (start, end) in enumerate(self.chunk_spans(text)):
+            chunks.append(
+                {
                     "chunk_id": str(uuid.uuid4()),
                     "memory_id": memory_id,
                     "chunk_index": idx,
-                    "chunk_text": chunk_text,
+                    "offset": start,
+                    "length": end - start,
+                    "chunk_text": text[start:end],
                     "source": source,
                     "created_at": created_at,
                 }
-                all_chunks.append(chunk)
+            )
 
-        return all_chunks
+        return chunks
 
     def run(self):
         """
@@ -102,3 +245,47 @@ class Chunker:
         chunks = self.build_chunks()
         self.save_chunks(chunks)
         print(f"Chunking complete. Generated {len(chunks)} chunks.")
+
+
+# -------------------------------------------------
+# Scanning helpers
+# -------------------------------------------------
+
+def _count_tokens(text: str, start: int, end: int) -> int:
+    return sum(1 for _ in _TOKEN_RE.finditer(text, start, end))
+
+
+def _strip(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _paragraphs(text: str) -> Iterator[Tuple[int, int]]:
+    pos = 0
+
+    for match in _PARAGRAPH_BREAK_RE.finditer(text):
+        start, end = _strip(text, pos, match.start())
+        if start < end:
+            yield start, end
+        pos = match.end()
+
+    start, end = _strip(text, pos, len(text))
+    if start < end:
+        yield start, end
+
+
+def _sentences(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    pos = start
+
+    for match in _SENTENCE_END_RE.finditer(text, start, end):
+        s_start, s_end = _strip(text, pos, match.end())
+        if s_start < s_end:
+            yield s_start, s_end
+        pos = match.end()
+
+    s_start, s_end = _strip(text, pos, end)
+    if s_start < s_end:
+        yield s_start, s_end
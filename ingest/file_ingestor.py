@@ -1,4 +1,6 @@
 import os
+from typing import Dict
+
 from pypdf import PdfReader
 
 from memory.metadata_store import MetadataStore
@@ -30,38 +32,65 @@ class FileIngestor:
     # Public API
     # -------------------------------------------------
 
-    def ingest(self, filepath: str):
+    def ingest(self, filepath: str) -> Dict:
+        """
+        Ingest one file. Returns the delta it produced
+        (memory, chunks, embeddings) for snapshot publishing.
+        """
         if not os.path.exists(filepath):
             raise FileNotFoundError(filepath)
 
+        # Never mix embedding generations in one store
+        foreign = self.embedding_store.models() - {self.embedder.model_name}
+        if foreign:
+            raise ValueError(
+                f"Embedding store uses {sorted(foreign)}, "
+                f"but the ingest embedder is {self.embedder.model_name}"
+            )
+
         # 1️⃣ Read file into raw text
         text = self._read_file(filepath)
 
         # 2️⃣ Store raw memory (append-only truth)
-        self.metadata_store.add_memory(
+        memory = self.metadata_store.add_memory(
             text=text,
             source=filepath,
             mem_type="file",
         )
 
-        # 3️⃣ Clear old chunks (derived data)
-        self.chunker.save_chunks([])
+        # 3️⃣ Chunk the NEW memory only (existing chunks are unchanged)
+        chunks = self.chunker.chunk_memory(memory)
+        self.chunker.save_chunks(self.chunker.load_chunks() + chunks)
 
-        # 4️⃣ Rebuild ALL chunks deterministically
-        chunks = self.chunker.build_chunks()
-        self.chunker.save_chunks(chunks)
+        # 4️⃣ Persist chunks + embeddings (one write each)
+        self.metadata_store.add_chunks(chunks)
 
-        
-        # 4️⃣ Persist chunks + embeddings (immediate-write store)
-        for chunk in chunks:
-            self.metadata_store.add_chunk(chunk)
+        # Embed in the store's layout (dense / sparse)
+        embed = (
+            self.embedder.embed_sparse
+            if self.embedding_store.sparse
+            else self.embedder.embed
+        )
+        self.embedding_store.add_many(
+            (
+                (chunk["chunk_id"], embed(chunk["chunk_text"]))
+                for chunk in chunks
+            ),
+            model_name=self.embedder.model_name,
+        )
 
-            vector = self.embedder.embed(chunk["chunk_text"])
-            self.embedding_store.add(
-                chunk_id=chunk["chunk_id"],
-                vector=vector,
-                model_name=self.embedder.model_name,
-            )
+        chunk_ids = [chunk["chunk_id"] for chunk in chunks]
+        memory = {k: v for k, v in memory.items() if k != "text"}
+
+        return {
+            "memories": [memory],
+            "chunks": {
+                cid: self.metadata_store.chunks[cid].to_dict() for cid in chunk_ids
+            },
+            "embeddings": {
+                cid: self.embedding_store.record(cid) for cid in chunk_ids
+            },
+        }
 
     # -------------------------------------------------
     # File readers
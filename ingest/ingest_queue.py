@@ -0,0 +1,243 @@
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from ingest.file_ingestor import FileIngestor
+from memory.snapshot_store import SnapshotStore
+
+
+class IngestQueue:
+    """
+    Durable on-disk FIFO of ingest jobs.
+
+    queue_dir/
+    - pending/<ns>-<id>.json   waiting jobs (oldest first)
+    - done/ , failed/          finished jobs (with result / error)
+    - worker.lock              held by the single active worker
+    """
+
+    def __init__(self, queue_dir: str):
+        self.queue_dir = queue_dir
+        self.lock_path = os.path.join(queue_dir, "worker.lock")
+
+        for name in ("pending", "done", "failed"):
+            os.makedirs(os.path.join(queue_dir, name), exist_ok=True)
+
+    def submit(self, filepath: str) -> str:
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "filepath": os.path.abspath(filepath),
+            "submitted_at": datetime.utcnow().isoformat(),
+        }
+
+        path = self._path("pending", f"{time.time_ns():020d}-{job_id}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(job, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+        return job_id
+
+    def pending(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self._path("pending"))
+            if name.endswith(".json")
+        )
+
+    def read(self, name: str) -> Dict:
+        with open(self._path("pending", name), "r") as f:
+            return json.load(f)
+
+    def finish(self, name: str, job: Dict, failed: bool = False):
+        target = self._path("failed" if failed else "done", name)
+        with open(target, "w") as f:
+            json.dump(job, f, indent=2)
+        os.remove(self._path("pending", name))
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.queue_dir, *parts)
+
+
+class IngestWorker:
+    """
+    Single writer for all persistent state.
+
+    Holds an exclusive file lock while it mutates metadata/embeddings,
+    so concurrent ingests are serialized. After each job it publishes
+    an immutable snapshot (previous segments + one new segment);
+    readers never see partially written state.
+    """
+
+    def __init__(
+        self,
+        queue: IngestQueue,
+        ingestor: FileIngestor,
+        snapshots: SnapshotStore,
+    ):
+        self.queue = queue
+        self.ingestor = ingestor
+        self.snapshots = snapshots
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def drain(self) -> Optional[List[Dict]]:
+        """
+        Process every pending job. Returns None if another worker
+        already holds the lock (it will pick up our jobs).
+        """
+        results = []
+
+        while True:
+            with self._locked(blocking=False) as acquired:
+                if not acquired:
+                    return results or None
+
+                self._bootstrap()
+                while self.queue.pending():
+                    results.append(self._run_next())
+
+            # A submitter may have lost the lock race just before we let go
+            if not self.queue.pending():
+                return results
+
+    def bootstrap(self) -> Optional[int]:
+        """
+        Make sure a base snapshot exists, without running queued jobs.
+        Waits for the lock (a running worker publishes one first).
+        """
+        with self._locked():
+            self._bootstrap()
+            return self.snapshots.current_version()
+
+    def run_exclusive(self, fn):
+        """
+        Run fn while holding the writer lock, then republish the full
+        state as one fresh segment (e.g. embedding switch-over).
+        """
+        with self._locked():
+            result = fn()
+            self._reload_stores()
+            self._publish([self._full_segment()])
+            return result
+
+    # -------------------------------------------------
+    # Jobs
+    # -------------------------------------------------
+
+    def _run_next(self) -> Dict:
+        name = self.queue.pending()[0]
+        job = self.queue.read(name)
+
+        try:
+            delta = self.ingestor.ingest(job["filepath"])
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+            self.queue.finish(name, job, failed=True)
+            return job
+
+        segments = self._current_segments()
+        segments.append(self.snapshots.write_segment(delta))
+        job["version"] = self._publish(segments)
+        job["chunks"] = len(delta["chunks"])
+
+        self.queue.finish(name, job)
+        return job
+
+    # -------------------------------------------------
+    # Snapshot publishing
+    # -------------------------------------------------
+
+    def _bootstrap(self):
+        """
+        First run: publish the pre-existing stores as the base snapshot.
+        """
+        self._reload_stores()
+        if self.snapshots.current_version() is None:
+            self._publish([self._full_segment()])
+
+    def _current_segments(self) -> List[str]:
+        version = self.snapshots.current_version()
+        if version is None:
+            return []
+        return list(self.snapshots.read_manifest(version)["segments"])
+
+    def _full_segment(self) -> str:
+        return self.snapshots.write_segment(
+            {
+                "memories": self.ingestor.metadata_store.all_memories(),
+                "chunks": self.ingestor.metadata_store.export_chunks(),
+                "embeddings": self.ingestor.embedding_store.all(),
+            }
+        )
+
+    def _publish(self, segments: List[str]) -> int:
+        models = self.ingestor.embedding_store.models()
+
+        version = self.snapshots.publish(
+            segments,
+            embedding_model=models.pop() if len(models) == 1 else None,
+        )
+        self.snapshots.prune()
+        return version
+
+    def _reload_stores(self):
+        # Another process may have written since we loaded
+        self.ingestor.metadata_store.reload()
+        self.ingestor.embedding_store.reload()
+
+    @contextmanager
+    def _locked(self, blocking: bool = True):
+        with open(self.queue.lock_path, "w") as lock:
+            if not _lock_file(lock, blocking):
+                yield False
+                return
+
+            try:
+                yield True
+            finally:
+                _unlock_file(lock)
+
+
+# -------------------------------------------------
+# Cross-platform exclusive file lock
+# -------------------------------------------------
+
+def _lock_file(lock, blocking: bool) -> bool:
+    if fcntl is not None:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock, flags)
+        except BlockingIOError:
+            return False
+        return True
+
+    # msvcrt locks a byte range; LK_LOCK gives up after ~10s, so poll
+    while True:
+        try:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.1)
+
+
+def _unlock_file(lock):
+    if fcntl is not None:
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    else:
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
@@ -1,34 +1,49 @@
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 from memory.metadata_store import MetadataStore
+from memory.snapshot_store import SnapshotReader
+from retrieval.context_packer import ContextPacker, count_tokens
+from llm.gateway import Groq, LLMGateway
 from dotenv import load_dotenv
 load_dotenv()
 
 
-try:
-    from groq import Groq
-except ImportError:
-    Groq = None
-
-
 class AnswerGenerator:
     """
     Knowledge-grounded answer generator.
     Uses Groq as a language renderer under strict constraints.
     """
 
-    def __init__(self, metadata_store_path: str, use_groq: bool = True):
-        self.metadata_store = MetadataStore(metadata_store_path)
+    def __init__(
+        self,
+        metadata_store_path: Optional[str] = None,
+        use_groq: bool = True,
+        context_packer: Optional[ContextPacker] = None,
+        hedge_after: Optional[float] = None,
+        snapshots: Optional[SnapshotReader] = None,
+    ):
+        # Chunk source: pinned snapshot (shared with the Retriever) or live file
+        self.snapshots = snapshots
+        self.metadata_store = (
+            snapshots if snapshots is not None
+            else MetadataStore(metadata_store_path)
+        )
+        self.context_packer = context_packer
 
         self.use_groq = use_groq and Groq is not None
-        self.groq_client = None
+        self.gateway = None
 
         if self.use_groq:
             api_key = os.getenv("GROQ_API_KEY")
             if not api_key:
                 raise RuntimeError("GROQ_API_KEY not set in environment")
 
-            self.groq_client = Groq(api_key=api_key)
+            # Shared across instances: coalescing + pooled connections
+            self.gateway = LLMGateway.shared(
+                api_key=api_key,
+                base_url=os.getenv("GROQ_BASE_URL"),
+                hedge_after=hedge_after,
+            )
 
     # -------------------------------------------------
     # Public API
@@ -44,27 +59,32 @@ class AnswerGenerator:
         if retrieval_status == "EMPTY":
             return self._handle_empty()
 
-        chunk_texts = self._resolve_chunks(retrieved_chunks)
+        if retrieval_status not in ("LOW_CONFIDENCE", "SUCCESS"):
+            raise ValueError(f"Unknown retrieval status: {retrieval_status}")
 
-        if retrieval_status == "LOW_CONFIDENCE":
-            answer = self._answer_with_llm(
-                query_text, chunk_texts, cautious=True
-            )
-            confidence = "LOW"
+        chunk_texts = self._resolve_chunks(retrieved_chunks)
+        context_stats = self._pack_context(chunk_texts)
+        chunk_texts = context_stats.pop("chunks")
 
-        elif retrieval_status == "SUCCESS":
+        # Confidence follows distinct evidence: collapsed near-duplicates
+        # are one piece of support, budget drops still count
+        if retrieval_status == "SUCCESS" and context_stats["distinct_chunks"] > 2:
             answer = self._answer_with_llm(
                 query_text, chunk_texts, cautious=False
             )
             confidence = "HIGH"
 
         else:
-            raise ValueError(f"Unknown retrieval status: {retrieval_status}")
+            answer = self._answer_with_llm(
+                query_text, chunk_texts, cautious=True
+            )
+            confidence = "LOW"
 
         return {
             "answer_text": answer,
             "confidence": confidence,
             "grounded_chunk_ids": [c["chunk_id"] for c in chunk_texts],
+            "context": context_stats,
         }
 
     # -------------------------------------------------
@@ -78,6 +98,14 @@ class AnswerGenerator:
             ),
             "confidence": "EMPTY",
             "grounded_chunk_ids": [],
+            "context": {
+                "dropped_chunk_ids": [],
+                "duplicate_chunk_ids": [],
+                "over_budget_chunk_ids": [],
+                "distinct_chunks": 0,
+                "tokens_used": 0,
+                "tokens_saved": 0,
+            },
         }
 
     def _resolve_chunks(self, retrieved_chunks: List[Dict]) -> List[Dict]:
@@ -85,16 +113,39 @@ class AnswerGenerator:
 
         for item in retrieved_chunks:
             chunk = self.metadata_store.get_chunk(item["chunk_id"])
+
+            # Retrieved from a newer snapshot than ours: hot-swap once
+            if chunk is None and self.snapshots is not None and self.snapshots.refresh():
+                chunk = self.metadata_store.get_chunk(item["chunk_id"])
+
             if chunk:
                 resolved.append(
                     {
                         "chunk_id": item["chunk_id"],
                         "chunk_text": chunk["chunk_text"],
+                        "similarity": item.get("similarity", 0.0),
                     }
                 )
 
         return resolved
 
+    def _pack_context(self, chunk_texts: List[Dict]) -> Dict:
+        """
+        Dedupe + token-budget the resolved chunks (if a packer is set).
+        """
+        if self.context_packer is not None:
+            return self.context_packer.pack(chunk_texts)
+
+        return {
+            "chunks": chunk_texts,
+            "dropped_chunk_ids": [],
+            "duplicate_chunk_ids": [],
+            "over_budget_chunk_ids": [],
+            "distinct_chunks": len(chunk_texts),
+            "tokens_used": sum(count_tokens(c["chunk_text"]) for c in chunk_texts),
+            "tokens_saved": 0,
+        }
+
     # -------------------------------------------------
     # LLM Interface (Groq or Mock)
     # -------------------------------------------------
@@ -140,7 +191,7 @@ class AnswerGenerator:
         return self._mock_llm_answer(context, cautious)
 
     def _groq_completion(self, system_prompt: str, user_prompt: str) -> str:
-        response = self.groq_client.chat.completions.create(
+        return self.gateway.complete(
             model="llama-3.1-8b-instant",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -150,8 +201,6 @@ class AnswerGenerator:
             max_tokens=512,
         )
 
-        return response.choices[0].message.content.strip()
-
     # -------------------------------------------------
     # Deterministic fallback (for testing)
     # -------------------------------------------------
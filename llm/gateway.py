@@ -0,0 +1,202 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import groq
+    from groq import Groq
+except ImportError:
+    groq = None
+    Groq = None
+
+
+if groq is not None:
+    TRANSIENT_ERRORS: Tuple[type, ...] = (
+        groq.APIConnectionError,  # includes APITimeoutError
+        groq.RateLimitError,
+        groq.InternalServerError,
+    )
+else:
+    TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+
+
+# -------------------------------------------------
+# Shared keep-alive HTTP pool (one per process)
+# -------------------------------------------------
+
+_http_lock = threading.Lock()
+_http_client = None
+
+
+def shared_http_client():
+    """
+    Pooled keep-alive client shared by every gateway in the process.
+    """
+    global _http_client
+
+    if httpx is None:
+        return None
+
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=20,
+                    max_keepalive_connections=10,
+                    keepalive_expiry=30.0,
+                ),
+            )
+        return _http_client
+
+
+class LLMGateway:
+    """
+    Resilient chat-completion gateway.
+
+    - Single-flight: identical in-flight prompts share one provider call
+    - Shared pooled keep-alive HTTP client + per-request timeout
+    - Retries transient errors with full-jitter exponential backoff
+    - Optional hedging: fire a second request if the first is slow
+    """
+
+    _shared: Dict[Tuple, "LLMGateway"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        hedge_after: Optional[float] = None,
+        client=None,
+    ):
+        if client is None:
+            if Groq is None:
+                raise RuntimeError("groq package is not installed")
+
+            # SDK retries are disabled: retry policy lives here
+            client = Groq(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=0,
+                http_client=shared_http_client(),
+            )
+
+        self.client = client
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+            if hedge_after is not None
+            else None
+        )
+
+    @classmethod
+    def shared(cls, **kwargs) -> "LLMGateway":
+        """
+        Process-wide gateway per configuration, so AnswerGenerator
+        instances share coalescing state and connections.
+        """
+        key = tuple(sorted(kwargs.items()))
+
+        with cls._shared_lock:
+            gateway = cls._shared.get(key)
+            if gateway is None:
+                gateway = cls(**kwargs)
+                cls._shared[key] = gateway
+            return gateway
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float = 0.1,
+        max_tokens: int = 512,
+    ) -> str:
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        key = (json.dumps(request, sort_keys=True),)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        # Followers wait for the leader's call
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._call_with_retry(request)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # -------------------------------------------------
+    # Provider calls
+    # -------------------------------------------------
+
+    def _call_with_retry(self, request: Dict) -> str:
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self._executor is not None:
+                    return self._call_hedged(request)
+                return self._call(request)
+
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def _call_hedged(self, request: Dict) -> str:
+        primary = self._executor.submit(self._call, request)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        pending = {primary, self._executor.submit(self._call, request)}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+
+        raise error
+
+    def _call(self, request: Dict) -> str:
+        response = self.client.chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
@@ -1,10 +1,18 @@
 import sys
 import os
+import re
+from datetime import datetime, timedelta
 
 from ingest.file_ingestor import FileIngestor
 from ingest.chunker import Chunker
+from ingest.ingest_queue import IngestQueue, IngestWorker
 from embeddings.embedder import SimpleEmbedder
+from embeddings.embedding_store import EmbeddingStore
+from embeddings.reembed import ReembedJob
+from memory.blob_store import BlobStore
+from memory.snapshot_store import SnapshotReader, SnapshotStore
 from retrieval.retriever import Retriever
+from retrieval.context_packer import ContextPacker
 from llm.answer_generator import AnswerGenerator
 
 
@@ -17,15 +25,36 @@ DATA_DIR = "data"
 METADATA_PATH = os.path.join(DATA_DIR, "metadata.json")
 CHUNK_PATH = os.path.join(DATA_DIR, "chunks.json")
 EMBEDDING_PATH = os.path.join(DATA_DIR, "embeddings.json")
+BLOB_DIR = os.path.join(DATA_DIR, "blobs")
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+QUEUE_DIR = os.path.join(DATA_DIR, "queue")
+
+CONTEXT_TOKEN_BUDGET = 1024
 
 
 # -----------------------------
 # Command handlers
 # -----------------------------
 
-def handle_ingest(filepath: str):
-    embedder = SimpleEmbedder()
+def load_embedder() -> SimpleEmbedder:
+    """
+    Embedder matching the active embedding generation.
+    """
+    snapshots = SnapshotStore(SNAPSHOT_DIR)
+    version = snapshots.current_version()
+
+    if version is not None:
+        model = snapshots.read_manifest(version)["embedding_model"]
+    else:
+        models = EmbeddingStore(EMBEDDING_PATH).models()
+        model = models.pop() if len(models) == 1 else None
 
+    if model is None:
+        return SimpleEmbedder()
+    return SimpleEmbedder.from_model_name(model)
+
+
+def build_worker() -> IngestWorker:
     chunker = Chunker(
         memory_path=METADATA_PATH,
         chunk_path=CHUNK_PATH,
@@ -34,28 +63,72 @@ def handle_ingest(filepath: str):
     ingestor = FileIngestor(
         metadata_path=METADATA_PATH,
         embedding_store_path=EMBEDDING_PATH,
-        embedder=embedder,
+        embedder=load_embedder(),
         chunker=chunker,
     )
 
-    ingestor.ingest(filepath)
-    print("Ingestion complete.")
+    return IngestWorker(
+        queue=IngestQueue(QUEUE_DIR),
+        ingestor=ingestor,
+        snapshots=SnapshotStore(SNAPSHOT_DIR),
+    )
 
 
-def handle_ask(query: str):
-    embedder = SimpleEmbedder()
+def open_snapshots() -> SnapshotReader:
+    """
+    Pin the latest snapshot (publishing the base one on first use).
+    """
+    store = SnapshotStore(SNAPSHOT_DIR)
+    if store.current_version() is None:
+        # Read-only: publish the base snapshot, leave queued ingests alone
+        build_worker().bootstrap()
+
+    return SnapshotReader(store, BlobStore(BLOB_DIR))
+
+
+def build_pipeline():
+    snapshots = open_snapshots()
 
     retriever = Retriever(
-        embedding_store_path=EMBEDDING_PATH,
-        embedder=embedder,  # 🔒 REQUIRED
+        embedder=load_embedder(),  # 🔒 REQUIRED
+        snapshots=snapshots,
     )
 
-    retrieval_result = retriever.retrieve(query)
-
     generator = AnswerGenerator(
-        metadata_store_path=METADATA_PATH
+        snapshots=snapshots,
+        context_packer=ContextPacker(
+            vector_lookup=retriever.vector,
+            token_budget=CONTEXT_TOKEN_BUDGET,
+        ),
     )
 
+    return retriever, generator
+
+
+def handle_ingest(filepath: str):
+    worker = build_worker()
+    worker.queue.submit(filepath)
+
+    results = worker.drain()
+    if results is None:
+        print("Queued: another ingest is running and will process it.")
+        return
+
+    for job in results:
+        if "error" in job:
+            print(f"Ingestion failed for {job['filepath']}: {job['error']}")
+        else:
+            print(
+                f"Ingestion complete: {job['filepath']} "
+                f"({job['chunks']} chunks, snapshot v{job['version']})."
+            )
+
+
+def handle_ask(query: str, source: str = None, since: datetime = None):
+    retriever, generator = build_pipeline()
+
+    retrieval_result = retriever.retrieve(query, source=source, since=since)
+
     answer = generator.generate(
         query_text=query,
         retrieval_status=retrieval_result["status"],
@@ -65,21 +138,17 @@ def handle_ask(query: str):
     print("\nAnswer:")
     print(answer["answer_text"])
     print(f"\nConfidence: {answer['confidence']}")
+    print(
+        f"Context tokens: {answer['context']['tokens_used']} "
+        f"(saved {answer['context']['tokens_saved']})"
+    )
 
 
 def handle_chat():
     print("Entering chat mode. Type 'exit' to quit.\n")
 
-    embedder = SimpleEmbedder()
-
-    retriever = Retriever(
-        embedding_store_path=EMBEDDING_PATH,
-        embedder=embedder,  # 🔒 REQUIRED
-    )
-
-    generator = AnswerGenerator(
-        metadata_store_path=METADATA_PATH
-    )
+    # Pinned once; every query hot-swaps to newer snapshots
+    retriever, generator = build_pipeline()
 
     while True:
         query = input("> ").strip()
@@ -95,7 +164,72 @@ def handle_chat():
         )
 
         print(answer["answer_text"])
-        print(f"[confidence: {answer['confidence']}]\n")
+        print(
+            f"[confidence: {answer['confidence']} | "
+            f"context tokens: {answer['context']['tokens_used']}, "
+            f"saved: {answer['context']['tokens_saved']}]\n"
+        )
+
+
+def handle_reembed(dim: int, sparse: bool = False):
+    job = ReembedJob(
+        embedding_store_path=EMBEDDING_PATH,
+        metadata_store_path=METADATA_PATH,
+        embedder=SimpleEmbedder(dim=dim),
+        sparse=sparse,
+    )
+
+    # Queries keep using the old generation until the locked switch-over
+    job.run(switch=False)
+    build_worker().run_exclusive(job.switch_over)
+
+    status = job.status()
+    print(
+        f"Re-embedded {status['done']}/{status['total']} chunks; "
+        f"active model is now {status['model']}."
+    )
+
+
+# -----------------------------
+# Argument helpers
+# -----------------------------
+
+def parse_since(value: str) -> datetime:
+    """
+    Accept a relative age (30m, 12h, 7d, 2w) or an ISO date/time.
+    Date-only and naive values are read as UTC.
+    """
+    match = re.fullmatch(r"(\d+)([mhdw])", value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        key = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}[unit]
+        return datetime.utcnow() - timedelta(**{key: amount})
+
+    return datetime.fromisoformat(value)
+
+
+def parse_ask_args(args):
+    """
+    Split `ask` arguments into (question words, filters).
+    """
+    words = []
+    filters = {}
+    i = 0
+
+    while i < len(args):
+        if args[i] in ("--source", "--since"):
+            if i + 1 == len(args):
+                raise ValueError(f"{args[i]} needs a value")
+            filters[args[i][2:]] = args[i + 1]
+            i += 2
+            continue
+        words.append(args[i])
+        i += 1
+
+    if "since" in filters:
+        filters["since"] = parse_since(filters["since"])
+
+    return words, filters
 
 
 # -----------------------------
@@ -107,8 +241,10 @@ def main():
         print(
             "Usage:\n"
             "  python main.py ingest <file_path>\n"
-            "  python main.py ask <question>\n"
-            "  python main.py chat"
+            "  python main.py ask [--source <file>] [--since <7d|date>] <question>\n"
+            "    (--since dates without a UTC offset are read as UTC)\n"
+            "  python main.py chat\n"
+            "  python main.py reembed <dim> [--sparse]"
         )
         return
 
@@ -121,15 +257,31 @@ def main():
         handle_ingest(sys.argv[2])
 
     elif command == "ask":
-        if len(sys.argv) < 3:
-            print("Usage: python main.py ask <question>")
+        try:
+            words, filters = parse_ask_args(sys.argv[2:])
+        except ValueError:
+            words = []  # missing filter value or unparseable --since
+
+        if not words:
+            print(
+                "Usage: python main.py ask "
+                "[--source <file>] [--since <7d|date>] <question>"
+            )
             return
-        query = " ".join(sys.argv[2:])
-        handle_ask(query)
+        query = " ".join(words)
+        handle_ask(query, **filters)
 
     elif command == "chat":
         handle_chat()
 
+    elif command == "reembed":
+        flags = sys.argv[3:]
+        valid = len(sys.argv) >= 3 and sys.argv[2].isdigit()
+        if not valid or flags not in ([], ["--sparse"]):
+            print("Usage: python main.py reembed <dim> [--sparse]")
+            return
+        handle_reembed(int(sys.argv[2]), sparse=bool(flags))
+
     else:
         print(f"Unknown command: {command}")
 
@@ -0,0 +1,60 @@
+import os
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+
+class BlobStore:
+    """
+    Compressed, write-once text blobs (one zlib file per key).
+
+    Raw memory bodies live here instead of inside metadata.json.
+    Blobs are loaded on demand and kept in a small LRU cache.
+    """
+
+    def __init__(self, directory: str, cache_size: int = 32, level: int = 9):
+        self.directory = directory
+        self.cache_size = cache_size
+        self.level = level
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.zz")
+
+    def put(self, key: str, text: str) -> str:
+        """
+        Compress + atomically write a blob. Returns the blob file name.
+        """
+        path = self._path(key)
+        temp_path = path + ".tmp"
+
+        with open(temp_path, "wb") as f:
+            f.write(zlib.compress(text.encode("utf-8"), self.level))
+
+        os.replace(temp_path, path)
+        self._remember(key, text)
+        return os.path.basename(path)
+
+    def get(self, key: str) -> Optional[str]:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "rb") as f:
+            text = zlib.decompress(f.read()).decode("utf-8")
+
+        self._remember(key, text)
+        return text
+
+    def _remember(self, key: str, text: str):
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -4,6 +4,9 @@ import uuid
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from memory.blob_store import BlobStore
+from memory.records import ChunkRecord
+
 
 class MetadataStore:
     """
@@ -13,6 +16,10 @@ class MetadataStore:
     - Store raw memories (append-only, immutable truth)
     - Store derived chunks (rebuildable meaning units)
     - Provide safe read access for downstream phases
+
+    Raw memory text is kept compressed in a BlobStore next to
+    metadata.json; chunks reference it by (memory_id, offset, length)
+    and are held in memory as slotted ChunkRecords.
     """
 
     def __init__(self, filepath: str):
@@ -21,9 +28,14 @@ class MetadataStore:
         # Ensure directory exists
         os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
 
+        # Compressed raw memory bodies
+        self.blobs = BlobStore(
+            os.path.join(os.path.dirname(self.filepath), "blobs")
+        )
+
         # In-memory state
         self.memories: List[Dict] = []
-        self.chunks: Dict[str, Dict] = {}
+        self.chunks: Dict[str, ChunkRecord] = {}
 
         # Load from disk (backward compatible)
         self._load()
@@ -39,6 +51,8 @@ class MetadataStore:
         Supports:
         - Phase-1 schema: List[Memory]
         - Phase-2+ schema: { memories: [...], chunks: {...} }
+        - Memories with inline "text" (migrated to blobs on next write)
+        - Chunks with inline "chunk_text" (become references on next write)
         """
         if not os.path.exists(self.filepath):
             self._atomic_persist()
@@ -55,23 +69,35 @@ class MetadataStore:
         # Phase-2+ format (dict with memories + chunks)
         elif isinstance(data, dict):
             self.memories = data.get("memories", [])
-            self.chunks = data.get("chunks", {})
+            self.chunks = {
+                cid: ChunkRecord.from_dict(chunk)
+                for cid, chunk in data.get("chunks", {}).items()
+            }
 
         else:
             raise ValueError("Unsupported metadata schema format")
 
+    def reload(self):
+        """
+        Re-read state written by another process.
+        """
+        self.memories, self.chunks = [], {}
+        self._load()
+
     def _atomic_persist(self):
         """
         Atomically write metadata to disk.
         Prevents corruption on crash or partial write.
         """
+        self._compact()
+
         temp_path = self.filepath + ".tmp"
 
         with open(temp_path, "w") as f:
             json.dump(
                 {
                     "memories": self.memories,
-                    "chunks": self.chunks,
+                    "chunks": self.export_chunks(),
                 },
                 f,
                 indent=2
@@ -79,6 +105,31 @@ class MetadataStore:
 
         os.replace(temp_path, self.filepath)
 
+    def _compact(self):
+        """
+        Move inline text (legacy records) into the blob store, and turn
+        legacy chunk copies into (offset, length) references when the
+        text occurs verbatim in its memory.
+        """
+        for memory in self.memories:
+            if "text" in memory:
+                text = memory.pop("text")
+                memory["blob"] = self.blobs.put(memory["memory_id"], text)
+                memory["text_length"] = len(text)
+
+        for chunk in self.chunks.values():
+            if chunk.chunk_text is None or chunk.memory_id is None:
+                continue
+
+            text = self.get_memory_text(chunk.memory_id)
+            offset = text.find(chunk.chunk_text) if text is not None else -1
+            if offset < 0:
+                continue  # no exact match: keep the inline copy
+
+            chunk.offset = offset
+            chunk.length = len(chunk.chunk_text)
+            chunk.chunk_text = None
+
     # -------------------------------------------------
     # Memory API (Phase-1)
     # -------------------------------------------------
@@ -88,9 +139,12 @@ class MetadataStore:
         Append a new raw memory.
         Existing memories are never modified.
         """
+        memory_id = str(uuid.uuid4())
+
         memory = {
-            "memory_id": str(uuid.uuid4()),
-            "text": text,
+            "memory_id": memory_id,
+            "blob": self.blobs.put(memory_id, text),
+            "text_length": len(text),
             "source": source,
             "type": mem_type,
             "timestamp": datetime.utcnow().isoformat(),
@@ -98,14 +152,29 @@ class MetadataStore:
 
         self.memories.append(memory)
         self._atomic_persist()
-        return memory
+        return dict(memory, text=text)
 
     def all_memories(self) -> List[Dict]:
         """
-        Return all stored raw memories.
+        Return all stored raw memories (text is loaded on demand).
         """
         return self.memories
 
+    def get_memory_text(self, memory_id: str) -> Optional[str]:
+        """
+        Resolve memory_id → raw text (decompressed on demand).
+        """
+        text = self.blobs.get(memory_id)
+        if text is not None:
+            return text
+
+        # Legacy record not yet migrated
+        for memory in self.memories:
+            if memory["memory_id"] == memory_id:
+                return memory.get("text")
+
+        return None
+
     # -------------------------------------------------
     # Chunk API (Phase-2 → Phase-4)
     # -------------------------------------------------
@@ -116,15 +185,42 @@ class MetadataStore:
 
         Chunk must include:
         - chunk_id
-        - chunk_text
-        - memory_id (recommended)
+        - memory_id + offset + length (text is NOT copied)
+          or chunk_text (legacy)
         """
-        self.chunks[chunk["chunk_id"]] = chunk
+        self.chunks[chunk["chunk_id"]] = ChunkRecord.from_dict(chunk)
         self._atomic_persist()
 
+    def add_chunks(self, chunks: List[Dict]):
+        """
+        Store a batch of derived chunks with a single write.
+        """
+        for chunk in chunks:
+            self.chunks[chunk["chunk_id"]] = ChunkRecord.from_dict(chunk)
+        self._atomic_persist()
+
+    def export_chunks(self) -> Dict[str, Dict]:
+        """
+        Persisted (JSON) form of all chunks.
+        """
+        return {cid: chunk.to_dict() for cid, chunk in self.chunks.items()}
+
     def get_chunk(self, chunk_id: str) -> Optional[Dict]:
         """
-        Resolve chunk_id → chunk data.
+        Resolve chunk_id → chunk data (with chunk_text).
         Used by AnswerGenerator.
         """
-        return self.chunks.get(chunk_id)
+        chunk = self.chunks.get(chunk_id)
+        if chunk is None:
+            return None
+
+        data = chunk.to_dict()
+        if chunk.offset is None:
+            return data
+
+        text = self.get_memory_text(chunk.memory_id)
+        if text is None:
+            return None
+
+        data["chunk_text"] = text[chunk.offset:chunk.offset + chunk.length]
+        return data
@@ -0,0 +1,63 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """
+    Share one copy of highly repeated strings (ids, sources, models).
+    """
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class ChunkRecord:
+    """
+    Compact in-memory chunk (no per-instance __dict__).
+
+    Text is normally NOT stored: it is sliced out of the memory blob
+    via (memory_id, offset, length). chunk_text is only set for
+    legacy records that predate offsets.
+    """
+
+    chunk_id: str
+    memory_id: Optional[str]
+    chunk_index: int = 0
+    offset: Optional[int] = None
+    length: Optional[int] = None
+    source: Optional[str] = None
+    created_at: Optional[str] = None
+    chunk_text: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ChunkRecord":
+        offset = data.get("offset")
+
+        return cls(
+            chunk_id=data["chunk_id"],
+            memory_id=intern(data.get("memory_id")),
+            chunk_index=data.get("chunk_index", 0),
+            offset=offset,
+            length=data.get("length"),
+            source=intern(data.get("source")),
+            created_at=intern(data.get("created_at")),
+            # Offsets make the copy redundant
+            chunk_text=data.get("chunk_text") if offset is None else None,
+        )
+
+    def to_dict(self) -> Dict:
+        data = {
+            "chunk_id": self.chunk_id,
+            "memory_id": self.memory_id,
+            "chunk_index": self.chunk_index,
+            "source": self.source,
+            "created_at": self.created_at,
+        }
+
+        if self.offset is not None:
+            data["offset"] = self.offset
+            data["length"] = self.length
+        else:
+            data["chunk_text"] = self.chunk_text
+
+        return data
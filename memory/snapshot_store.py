@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from embeddings.sparse_buffer import buffer_for
+from memory.blob_store import BlobStore
+from memory.records import ChunkRecord
+
+
+class SnapshotStore:
+    """
+    Immutable, versioned snapshots of memories + chunks + embeddings.
+
+    Layout (under root):
+    - seg-<sha1>.json        immutable segment (one per ingest job)
+    - manifest-<v>.json      ordered list of segments for version v
+    - CURRENT                name of the latest manifest (atomic swap)
+
+    Only the ingest worker writes; any number of readers may pin.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    # -------------------------------------------------
+    # Read side
+    # -------------------------------------------------
+
+    def current_version(self) -> Optional[int]:
+        path = os.path.join(self.root, "CURRENT")
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as f:
+            return self._manifest_version(f.read().strip())
+
+    def read_manifest(self, version: int) -> Dict:
+        with open(os.path.join(self.root, self._manifest_name(version)), "r") as f:
+            return json.load(f)
+
+    def read_segment(self, name: str) -> Dict:
+        with open(os.path.join(self.root, name), "r") as f:
+            return json.load(f)
+
+    # -------------------------------------------------
+    # Write side (ingest worker only)
+    # -------------------------------------------------
+
+    def write_segment(self, payload: Dict) -> str:
+        """
+        Persist a segment; content-addressed, so rewrites are no-ops.
+        """
+        data = json.dumps(payload, sort_keys=True)
+        name = f"seg-{hashlib.sha1(data.encode()).hexdigest()}.json"
+
+        path = os.path.join(self.root, name)
+        if not os.path.exists(path):
+            self._atomic_write(path, data)
+
+        return name
+
+    def publish(self, segments: List[str], embedding_model: Optional[str]) -> int:
+        """
+        Write the next manifest and atomically make it CURRENT.
+        """
+        version = (self.current_version() or 0) + 1
+        manifest = {
+            "version": version,
+            "segments": segments,
+            "embedding_model": embedding_model,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
+        name = self._manifest_name(version)
+        self._atomic_write(os.path.join(self.root, name), json.dumps(manifest, indent=2))
+        self._atomic_write(os.path.join(self.root, "CURRENT"), name)
+        return version
+
+    def prune(self, keep_versions: int = 5):
+        """
+        Delete manifests/segments no longer reachable from recent versions.
+        """
+        current = self.current_version()
+        if current is None:
+            return
+
+        live: Set[str] = {"CURRENT"}
+        for version in range(max(1, current - keep_versions + 1), current + 1):
+            live.add(self._manifest_name(version))
+            live.update(self.read_manifest(version)["segments"])
+
+        for name in os.listdir(self.root):
+            if name.endswith(".json") and name not in live:
+                os.remove(os.path.join(self.root, name))
+
+    # -------------------------------------------------
+    # Helpers
+    # -------------------------------------------------
+
+    def _atomic_write(self, path: str, data: str):
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _manifest_name(self, version: int) -> str:
+        return f"manifest-{version:06d}.json"
+
+    def _manifest_version(self, name: str) -> int:
+        return int(name[len("manifest-"):-len(".json")])
+
+
+class SnapshotReader:
+    """
+    Pinned, read-only view of one snapshot version.
+
+    Exposes the read API of MetadataStore (chunks, all_memories,
+    get_memory_text, get_chunk) and EmbeddingStore (buffer, all,
+    models). refresh() hot-swaps to the latest version: when the new
+    manifest only appends segments, just those are loaded and merged
+    into the existing records and vector buffer (dense or sparse,
+    as published).
+    """
+
+    def __init__(self, store: SnapshotStore, blobs: BlobStore):
+        self.store = store
+        self.blobs = blobs
+
+        self.version: Optional[int] = None
+        self.embedding_model: Optional[str] = None
+        self._loaded: List[str] = []
+
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self.memories: List[Dict] = []
+        self.chunks: Dict[str, ChunkRecord] = {}
+        self.buffer = buffer_for()
+        self._loaded = []
+
+    # -------------------------------------------------
+    # Version handling
+    # -------------------------------------------------
+
+    def refresh(self) -> bool:
+        """
+        Pin the latest published version. Returns True if it changed.
+        """
+        version = self.store.current_version()
+        if version is None or version == self.version:
+            return False
+
+        try:
+            manifest = self.store.read_manifest(version)
+            names = manifest["segments"]
+
+            appended = names[:len(self._loaded)] == self._loaded
+            new_names = names[len(self._loaded):] if appended else names
+            segments = [self.store.read_segment(name) for name in new_names]
+
+        except FileNotFoundError:
+            # Pruned under our feet: a newer version was published, retry
+            if self.store.current_version() == version:
+                raise
+            return self.refresh()
+
+        if not appended:
+            self._reset()
+
+        for segment in segments:
+            self._merge(segment)
+
+        self._loaded = list(names)
+        self.embedding_model = manifest.get("embedding_model")
+        self.version = version
+        return True
+
+    def _merge(self, segment: Dict):
+        self.memories.extend(segment["memories"])
+
+        for cid, chunk in segment["chunks"].items():
+            self.chunks[cid] = ChunkRecord.from_dict(chunk)
+
+        for record in segment["embeddings"].values():
+            if not len(self.buffer):
+                # Layout (dense / sparse) follows the published records
+                self.buffer = buffer_for(record)
+            self.buffer.add_record(record)
+
+    # -------------------------------------------------
+    # MetadataStore-compatible reads
+    # -------------------------------------------------
+
+    def all_memories(self) -> List[Dict]:
+        return self.memories
+
+    def get_memory_text(self, memory_id: str) -> Optional[str]:
+        text = self.blobs.get(memory_id)
+        if text is not None:
+            return text
+
+        # Legacy record published before its text was moved to a blob
+        for memory in self.memories:
+            if memory["memory_id"] == memory_id:
+                return memory.get("text")
+
+        return None
+
+    def get_chunk(self, chunk_id: str) -> Optional[Dict]:
+        chunk = self.chunks.get(chunk_id)
+        if chunk is None:
+            return None
+
+        data = chunk.to_dict()
+        if chunk.offset is None:
+            return data
+
+        text = self.get_memory_text(chunk.memory_id)
+        if text is None:
+            return None
+
+        data["chunk_text"] = text[chunk.offset:chunk.offset + chunk.length]
+        return data
+
+    # -------------------------------------------------
+    # EmbeddingStore-compatible reads
+    # -------------------------------------------------
+
+    def all(self) -> Dict[str, Dict]:
+        return self.buffer.records()
+
+    def chunk_ids(self) -> List[str]:
+        return self.buffer.chunk_ids
+
+    def models(self) -> Set[str]:
+        return self.buffer.models()
@@ -0,0 +1,143 @@
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from memory.metadata_store import MetadataStore
+
+
+class AttributeIndex:
+    """
+    Precomputed attribute indexes over VectorIndex rows.
+
+    - source / type → row bitmap (Python int, bit i = row i)
+    - memory timestamp → sorted array of (timestamp, row)
+
+    Filters are resolved to a row list BEFORE vector scoring,
+    so the scorer never touches non-matching rows.
+    """
+
+    def __init__(self, chunk_ids: List[str], metadata_store: MetadataStore):
+        self.size = len(chunk_ids)
+
+        source_rows: Dict[str, List[int]] = {}
+        type_rows: Dict[str, List[int]] = {}
+
+        memories = {
+            m["memory_id"]: m for m in metadata_store.all_memories()
+        }
+
+        timed = []
+
+        for row, chunk_id in enumerate(chunk_ids):
+            chunk = metadata_store.chunks.get(chunk_id)
+            if chunk is None:
+                continue  # orphan embedding: matches no filter
+
+            memory = memories.get(chunk.memory_id, {})
+
+            source = chunk.source or memory.get("source")
+            if source is not None:
+                source_rows.setdefault(source, []).append(row)
+
+            mem_type = memory.get("type")
+            if mem_type is not None:
+                type_rows.setdefault(mem_type, []).append(row)
+
+            timestamp = memory.get("timestamp")
+            if timestamp is not None:
+                timed.append((timestamp, row))
+
+        self.by_source: Dict[str, int] = {
+            source: _rows_bitmap(rows, self.size)
+            for source, rows in source_rows.items()
+        }
+        self.by_type: Dict[str, int] = {
+            mem_type: _rows_bitmap(rows, self.size)
+            for mem_type, rows in type_rows.items()
+        }
+
+        timed.sort()
+        self.timestamps = [t for t, _ in timed]
+        self.time_rows = [r for _, r in timed]
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def select(
+        self,
+        source: Optional[str] = None,
+        mem_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Optional[List[int]]:
+        """
+        Resolve filters to matching rows (ascending).
+        Returns None when no filter is given (= all rows).
+        """
+        if source is None and mem_type is None and since is None and until is None:
+            return None
+
+        bitmap = (1 << self.size) - 1
+
+        if source is not None:
+            bitmap &= self._source_bitmap(source)
+
+        if mem_type is not None:
+            bitmap &= self.by_type.get(mem_type, 0)
+
+        if since is not None or until is not None:
+            bitmap &= self._time_bitmap(since, until)
+
+        return _bitmap_rows(bitmap)
+
+    # -------------------------------------------------
+    # Bitmap builders
+    # -------------------------------------------------
+
+    def _source_bitmap(self, source: str) -> int:
+        """
+        Match the exact stored source, or its file name.
+        """
+        bitmap = 0
+        for key, bits in self.by_source.items():
+            if key == source or os.path.basename(key) == source:
+                bitmap |= bits
+        return bitmap
+
+    def _time_bitmap(
+        self,
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> int:
+        lo = 0 if since is None else bisect_left(self.timestamps, _utc_key(since))
+        hi = (
+            len(self.timestamps)
+            if until is None
+            else bisect_right(self.timestamps, _utc_key(until))
+        )
+
+        return _rows_bitmap(self.time_rows[lo:hi], self.size)
+
+
+def _utc_key(moment: datetime) -> str:
+    """
+    Stored timestamps are naive UTC isoformat strings; compare like with
+    like. Naive inputs are taken as UTC.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def _rows_bitmap(rows: List[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _bitmap_rows(bitmap: int) -> List[int]:
+    # bin() is little-endian after reversal: char i ↔ row i
+    return [i for i, bit in enumerate(bin(bitmap)[:1:-1]) if bit == "1"]
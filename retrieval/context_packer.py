@@ -0,0 +1,192 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+class ContextPacker:
+    """
+    Context assembly stage between retrieval and answer generation.
+
+    - MMR reranking (relevance vs. diversity) using stored embeddings
+      (vector_lookup: chunk_id → dense or sparse vector,
+      e.g. Retriever.vector)
+    - Near-duplicate suppression (cosine + word shingles)
+    - Greedy packing up to a token budget
+    """
+
+    def __init__(
+        self,
+        vector_lookup: Optional[Callable[[str], Optional[Any]]] = None,
+        token_budget: int = 1024,
+        mmr_lambda: float = 0.7,
+        duplicate_similarity: float = 0.95,
+        duplicate_overlap: float = 0.9,
+        shingle_size: int = 3,
+    ):
+        self.vector_lookup = vector_lookup
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_similarity = duplicate_similarity
+        self.duplicate_overlap = duplicate_overlap
+        self.shingle_size = shingle_size
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def pack(self, chunks: List[Dict]) -> Dict:
+        """
+        Select and order chunks for the prompt.
+
+        Each chunk needs chunk_id + chunk_text; similarity is optional
+        (rank order is used as relevance when it is missing).
+
+        Drops are reported by cause: duplicate_chunk_ids (same evidence
+        as a kept chunk) vs. over_budget_chunk_ids (distinct, did not
+        fit). distinct_chunks counts kept + distinct over-budget chunks.
+        """
+        candidates = []
+        tokens_in = 0
+
+        for position, chunk in enumerate(chunks):
+            tokens = count_tokens(chunk["chunk_text"])
+            tokens_in += tokens
+            candidates.append(
+                {
+                    "chunk": chunk,
+                    "relevance": chunk.get("similarity", 1.0 / (position + 1)),
+                    "vector": self._vector(chunk["chunk_id"]),
+                    "shingles": self._shingles(chunk["chunk_text"]),
+                    "tokens": tokens,
+                    "max_sim": 0.0,
+                }
+            )
+
+        selected: List[Dict] = []
+        over_budget: List[Dict] = []
+        duplicates: List[str] = []
+        tokens_used = 0
+
+        while candidates:
+            best = max(candidates, key=self._mmr_score)
+            candidates.remove(best)
+            chunk = best["chunk"]
+
+            if self._is_duplicate(best, selected):
+                duplicates.append(chunk["chunk_id"])
+                continue
+
+            if tokens_used + best["tokens"] > self.token_budget:
+                if selected:
+                    if self._is_duplicate(best, over_budget):
+                        duplicates.append(chunk["chunk_id"])
+                    else:
+                        over_budget.append(best)
+                    continue
+
+                # Never ground on nothing: keep a truncated head chunk
+                best["chunk"] = dict(
+                    chunk,
+                    chunk_text=truncate_tokens(
+                        chunk["chunk_text"], self.token_budget
+                    ),
+                )
+                best["tokens"] = self.token_budget
+
+            selected.append(best)
+            tokens_used += best["tokens"]
+
+            for other in candidates:
+                other["max_sim"] = max(
+                    other["max_sim"], self._similarity(best, other)
+                )
+
+        over_budget_ids = [c["chunk"]["chunk_id"] for c in over_budget]
+
+        return {
+            "chunks": [c["chunk"] for c in selected],
+            "dropped_chunk_ids": duplicates + over_budget_ids,
+            "duplicate_chunk_ids": duplicates,
+            "over_budget_chunk_ids": over_budget_ids,
+            "distinct_chunks": len(selected) + len(over_budget),
+            "tokens_used": tokens_used,
+            "tokens_saved": tokens_in - tokens_used,
+        }
+
+    # -------------------------------------------------
+    # Scoring
+    # -------------------------------------------------
+
+    def _mmr_score(self, candidate: Dict) -> float:
+        return (
+            self.mmr_lambda * candidate["relevance"]
+            - (1 - self.mmr_lambda) * candidate["max_sim"]
+        )
+
+    def _is_duplicate(self, candidate: Dict, selected: List[Dict]) -> bool:
+        for kept in selected:
+            a, b = candidate["vector"], kept["vector"]
+            if a is not None and b is not None:
+                if _dot(a, b) > self.duplicate_similarity:
+                    return True
+
+            if _jaccard(candidate["shingles"], kept["shingles"]) > self.duplicate_overlap:
+                return True
+
+        return False
+
+    def _similarity(self, a: Dict, b: Dict) -> float:
+        if a["vector"] is not None and b["vector"] is not None:
+            return _dot(a["vector"], b["vector"])
+        return _jaccard(a["shingles"], b["shingles"])
+
+    def _vector(self, chunk_id: str) -> Optional[Any]:
+        if self.vector_lookup is None:
+            return None
+        return self.vector_lookup(chunk_id)
+
+    def _shingles(self, text: str) -> Set[str]:
+        words = re.findall(r"\w+", text.lower())
+        n = self.shingle_size
+
+        if len(words) < n:
+            return {" ".join(words)} if words else set()
+
+        return {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate LLM token count (words + punctuation).
+    """
+    return sum(1 for _ in _TOKEN_RE.finditer(text))
+
+
+def truncate_tokens(text: str, limit: int) -> str:
+    end = 0
+    for i, match in enumerate(_TOKEN_RE.finditer(text)):
+        if i == limit:
+            break
+        end = match.end()
+    return text[:end]
+
+
+def _dot(a, b) -> float:
+    # Sparse vectors come as {bucket: value}
+    if isinstance(a, dict):
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(x * b.get(i, 0.0) for i, x in a.items())
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
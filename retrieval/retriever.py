@@ -1,46 +1,114 @@
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional
 from embeddings.embedder import SimpleEmbedder
 from embeddings.embedding_store import EmbeddingStore
 from embeddings.vector_index import VectorIndex
+from memory.metadata_store import MetadataStore
+from memory.snapshot_store import SnapshotReader
+from retrieval.attribute_index import AttributeIndex
 
 
 class Retriever:
     """
     Evidence exposure controller.
     Decides which chunks are allowed to influence reasoning.
+
+    Reads either the live store files or a pinned SnapshotReader;
+    with snapshots, each query first hot-swaps to the latest version.
     """
 
     def __init__(
         self,
-        embedding_store_path: str,
-        embedder: SimpleEmbedder,
+        embedding_store_path: Optional[str] = None,
+        embedder: Optional[SimpleEmbedder] = None,
         min_similarity: float = 0.35,
-        max_chunks: int = 5
+        max_chunks: int = 5,
+        metadata_store_path: Optional[str] = None,
+        snapshots: Optional[SnapshotReader] = None,
     ):
+        # Optional only so embedding_store_path can be omitted with snapshots
+        if embedder is None:
+            raise ValueError("Retriever requires an embedder")
+        if embedding_store_path is None and snapshots is None:
+            raise ValueError("Retriever requires embedding_store_path or snapshots")
+
         self.embedder = embedder
         self.min_similarity = min_similarity
         self.max_chunks = max_chunks
+        self.snapshots = snapshots
+
+        if snapshots is not None:
+            self.store = snapshots
+            self.metadata = snapshots
+        else:
+            # Load embeddings (derived, disposable)
+            self.store = EmbeddingStore(embedding_store_path)
+            self.metadata = (
+                MetadataStore(metadata_store_path)
+                if metadata_store_path is not None
+                else None
+            )
+
+        self._build_indexes()
+
+    def _build_indexes(self):
+        # Version the indexes describe (the reader may be refreshed
+        # by others sharing it, e.g. the AnswerGenerator)
+        self.built_version = getattr(self.store, "version", None)
+
+        # A switched-over generation brings its own query embedder
+        model = getattr(self.store, "embedding_model", None)
+        if model is not None and model != self.embedder.model_name:
+            self.embedder = SimpleEmbedder.from_model_name(model)
 
-        # Load embeddings (derived, disposable)
-        self.store = EmbeddingStore(embedding_store_path)
+        self._check_model()
 
         # Build similarity index
-        self.index = VectorIndex(self.store.all())
+        self.index = VectorIndex(self.store.buffer)
 
-    def retrieve(self, query_text: str) -> Dict:
+        # Attribute indexes over index rows (needed for filters)
+        self.attributes = None
+        if self.metadata is not None:
+            self.attributes = AttributeIndex(self.index.chunk_ids, self.metadata)
+
+    def retrieve(
+        self,
+        query_text: str,
+        source: Optional[str] = None,
+        mem_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Dict:
         """
         Retrieve admissible evidence for a query.
+
+        Optional filters (source / mem_type / since / until) are applied
+        before scoring: only matching index rows are compared.
         """
-        # 1️⃣ Embed query (normalized)
-        query_vector = self.embedder.embed(query_text)
+        # 0️⃣ Hot-swap to the latest snapshot (only new segments load)
+        if self.snapshots is not None:
+            self.snapshots.refresh()
+            if self.snapshots.version != self.built_version:
+                self._build_indexes()
+
+        # 1️⃣ Pre-filter rows (attribute indexes)
+        rows = self._filter_rows(source, mem_type, since, until)
+
+        # 2️⃣ Embed query (normalized; sparse index → sparse query,
+        #     so scoring only walks the query's buckets)
+        if self.index.sparse:
+            query_vector = self.embedder.embed_sparse(query_text)
+        else:
+            query_vector = self.embedder.embed(query_text)
 
-        # 2️⃣ Similarity search (candidate generation)
+        # 3️⃣ Similarity search (candidate generation)
         candidates = self.index.search(
             query_vector,
-            top_k=self.max_chunks * 2  # fetch more, filter later
+            top_k=self.max_chunks * 2,  # fetch more, filter later
+            rows=rows,
         )
 
-        # 3️⃣ Similarity threshold (admissibility gate)
+        # 4️⃣ Similarity threshold (admissibility gate)
         admissible = [
             {
                 "chunk_id": chunk_id,
@@ -50,13 +118,13 @@ class Retriever:
             if score >= self.min_similarity
         ]
 
-        # 4️⃣ Sort by similarity (strongest evidence first)
+        # 5️⃣ Sort by similarity (strongest evidence first)
         admissible.sort(key=lambda x: x["similarity"], reverse=True)
 
-        # 5️⃣ Top-k truncation (context budget)
+        # 6️⃣ Top-k truncation (context budget)
         admissible = admissible[: self.max_chunks]
 
-        # 6️⃣ Retrieval status decision
+        # 7️⃣ Retrieval status decision
         if len(admissible) == 0:
             status = "EMPTY"
         elif len(admissible) <= 2:
@@ -70,5 +138,55 @@ class Retriever:
 
         return {
             "status": status,
-            "results": admissible
+            "results": admissible,
+            "snapshot_version": (
+                self.snapshots.version if self.snapshots is not None else None
+            ),
         }
+
+    def vector(self, chunk_id: str):
+        """
+        Stored vector of a chunk in the currently pinned index
+        (float array, or {bucket: value} for a sparse index).
+        """
+        return self.index.get(chunk_id)
+
+    def _check_model(self):
+        """
+        Refuse to compare vectors from different embedding models.
+        """
+        models = self.store.models()
+
+        if len(models) > 1:
+            raise ValueError(
+                f"Embedding store mixes models {sorted(models)}; "
+                "finish re-embedding before querying"
+            )
+
+        if models and self.embedder.model_name not in models:
+            raise ValueError(
+                f"Embedding store uses {models.pop()}, "
+                f"but the query embedder is {self.embedder.model_name}"
+            )
+
+    def _filter_rows(
+        self,
+        source: Optional[str],
+        mem_type: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Optional[List[int]]:
+        if source is None and mem_type is None and since is None and until is None:
+            return None
+
+        if self.attributes is None:
+            raise ValueError(
+                "Filtered retrieval requires metadata_store_path or snapshots"
+            )
+
+        return self.attributes.select(
+            source=source,
+            mem_type=mem_type,
+            since=since,
+            until=until,
+        )